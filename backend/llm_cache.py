@@ -0,0 +1,125 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+# Optional dependency: the semantic cache only activates when
+# sentence-transformers (and numpy) are installed. Without them every
+# lookup is a miss and the app behaves exactly as before.
+try:
+    import numpy as np
+    from sentence_transformers import SentenceTransformer
+    _EMBEDDINGS_AVAILABLE = True
+except ImportError:
+    _EMBEDDINGS_AVAILABLE = False
+
+SEMANTIC_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.92"))
+SEMANTIC_CACHE_TTL = float(os.getenv("SEMANTIC_CACHE_TTL", "3600"))
+EMBEDDING_MODEL = os.getenv("SEMANTIC_CACHE_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+
+class ExactCache:
+    """
+    Exact-match LRU cache with per-entry TTL, keyed by a hash of the
+    full prompt. Cheaper than the semantic cache (no embedding), so it
+    is checked first; it only pays off because generation runs at a
+    near-deterministic temperature.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 3600.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        stored_at, parsed = entry
+        if time.time() - stored_at > self.ttl:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return parsed
+
+    def put(self, key: str, parsed: Dict[str, Any]) -> None:
+        self._entries[key] = (time.time(), parsed)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+
+class SemanticCache:
+    """
+    Caches parsed LLM responses keyed by embedding similarity of the
+    user description, so paraphrases of earlier prompts skip the
+    (multi-second) Gemini call entirely.
+
+    Lookups embed the description locally, compare against stored
+    vectors by cosine similarity (one numpy matmul - fine for the
+    thousands of entries this app will ever see), and return the stored
+    result when similarity >= threshold and the entry has not expired.
+    """
+
+    def __init__(self, threshold: float = SEMANTIC_THRESHOLD, ttl: float = SEMANTIC_CACHE_TTL):
+        self.enabled = _EMBEDDINGS_AVAILABLE
+        self.threshold = threshold
+        self.ttl = ttl
+        self._model: Optional["SentenceTransformer"] = None
+        # _vectors row i pairs with _entries[i]; the lock keeps them in
+        # step since get/put run on threadpool threads via
+        # asyncio.to_thread. Embedding happens outside the lock.
+        self._lock = threading.Lock()
+        self._vectors: Optional["np.ndarray"] = None  # (N, dim), L2-normalized
+        self._entries: List[Tuple[float, Dict[str, Any]]] = []  # (stored_at, parsed)
+
+    def _embed(self, text: str) -> "np.ndarray":
+        if self._model is None:
+            # Lazy-load so import (and app startup) stays fast.
+            self._model = SentenceTransformer(EMBEDDING_MODEL)
+        vec = self._model.encode([text], normalize_embeddings=True)[0]
+        return np.asarray(vec, dtype=np.float32)
+
+    def get(self, description: str) -> Optional[Dict[str, Any]]:
+        if not self.enabled:
+            return None
+        with self._lock:
+            if self._vectors is None:
+                return None
+
+        query = self._embed(description)
+
+        with self._lock:
+            self._prune_expired()
+            if self._vectors is None:
+                return None
+            sims = self._vectors @ query
+            best = int(sims.argmax())
+            if sims[best] >= self.threshold:
+                return self._entries[best][1]
+        return None
+
+    def put(self, description: str, parsed: Dict[str, Any]) -> None:
+        if not self.enabled:
+            return
+
+        vec = self._embed(description).reshape(1, -1)
+        with self._lock:
+            if self._vectors is None:
+                self._vectors = vec
+            else:
+                self._vectors = np.vstack([self._vectors, vec])
+            self._entries.append((time.time(), parsed))
+
+    def _prune_expired(self) -> None:
+        # Caller must hold self._lock.
+        cutoff = time.time() - self.ttl
+        keep = [i for i, (stored_at, _) in enumerate(self._entries) if stored_at >= cutoff]
+        if len(keep) == len(self._entries):
+            return
+        if not keep:
+            self._vectors = None
+            self._entries = []
+            return
+        self._vectors = self._vectors[keep]
+        self._entries = [self._entries[i] for i in keep]
@@ -1,50 +1,89 @@
+import asyncio
+import hashlib
 import os
-import requests
-import json
+import httpx
+import orjson
 from typing import Dict, Any
 from .utils import extract_json_from_text
+from .llm_cache import ExactCache, SemanticCache
 
 API_KEY = os.getenv("GEMINI_API_KEY")
 API_URL = os.getenv("GEMINI_API_URL", "https://generativelanguage.googleapis.com/v1beta2/models/text-bison-001:generate")
 
+# Shared client: keeps TLS connections alive across calls and multiplexes
+# concurrent requests over HTTP/2 instead of paying a handshake per call.
+_CLIENT = httpx.AsyncClient(
+    http2=True,
+    timeout=httpx.Timeout(60, connect=5),
+    limits=httpx.Limits(
+        max_connections=32,
+        max_keepalive_connections=16,
+        keepalive_expiry=30.0,
+    ),
+)
+
+async def close_client() -> None:
+    """Close the shared HTTP client (called on app shutdown)."""
+    await _CLIENT.aclose()
+
+# Per-attempt timeout: slow tails are retried instead of holding a worker
+# for the full 60 s client timeout.
+REQUEST_TIMEOUT = float(os.getenv("GEMINI_TIMEOUT", "15"))
+MAX_RETRIES = int(os.getenv("GEMINI_MAX_RETRIES", "3"))
+
+# With GEMINI_DETERMINISTIC=1 (the default) generation runs at
+# temperature 0, which makes identical prompts cache-eligible.
+DETERMINISTIC = os.getenv("GEMINI_DETERMINISTIC", "1") == "1"
+TEMPERATURE = 0.0 if DETERMINISTIC else 0.2
+
+# Two cache layers, cheapest first: an exact cache keyed by
+# sha256(prompt) for identical descriptions, then the semantic cache for
+# paraphrases (no-op unless the optional embedding deps are installed).
+_EXACT_CACHE = ExactCache(maxsize=1024, ttl=3600)
+_SEMANTIC_CACHE = SemanticCache()
+
+# Static prompt template, built once at import. Only the user
+# description varies per call.
+_PROMPT_PREFIX = (
+    "You are given a user's knowledge-graph description. "
+    "Return ONLY valid JSON in this exact schema:\n\n"
+    "{\n"
+    '  "notes": [\n'
+    "    {\n"
+    '      "id": "<unique-id>",\n'
+    '      "title": "<short title>",\n'
+    '      "content": "<one-paragraph content>",\n'
+    '      "color": "#hex",\n'
+    '      "x": 100,\n'
+    '      "y": 100\n'
+    "    }\n"
+    "  ],\n"
+    '  "relationships": [\n'
+    "    {\n"
+    '      "fromId": "<note-id>",\n'
+    '      "toId": "<note-id>",\n'
+    '      "type": "supports|relates|contradicts",\n'
+    '      "label": "<label text>"\n'
+    "    }\n"
+    "  ]\n"
+    "}\n\n"
+    "Constraints:\n"
+    "- Use at most 12 notes for initial output.\n"
+    "- Provide numeric x,y values suitable for a 1400x800 board (between 0 and 1400/800).\n"
+    "- IDs must be unique and safe to use as strings (no newlines).\n\n"
+    "User description:\n"
+)
+
+_PROMPT_SUFFIX = "\n\nReturn only JSON. Do not include any commentary."
+
 def build_prompt(description: str) -> str:
     """
     Builds a clear instruction prompt for the LLM.
     We ask the LLM to return strictly a JSON object with "notes" and "relationships".
     """
-    return (
-        "You are given a user's knowledge-graph description. "
-        "Return ONLY valid JSON in this exact schema:\n\n"
-        "{\n"
-        '  "notes": [\n'
-        "    {\n"
-        '      "id": "<unique-id>",\n'
-        '      "title": "<short title>",\n'
-        '      "content": "<one-paragraph content>",\n'
-        '      "color": "#hex",\n'
-        '      "x": 100,\n'
-        '      "y": 100\n'
-        "    }\n"
-        "  ],\n"
-        '  "relationships": [\n'
-        "    {\n"
-        '      "fromId": "<note-id>",\n'
-        '      "toId": "<note-id>",\n'
-        '      "type": "supports|relates|contradicts",\n'
-        '      "label": "<label text>"\n'
-        "    }\n"
-        "  ]\n"
-        "}\n\n"
-        "Constraints:\n"
-        "- Use at most 12 notes for initial output.\n"
-        "- Provide numeric x,y values suitable for a 1400x800 board (between 0 and 1400/800).\n"
-        "- IDs must be unique and safe to use as strings (no newlines).\n\n"
-        "User description:\n"
-        f"{description}\n\n"
-        "Return only JSON. Do not include any commentary."
-    )
-
-def call_gemini(prompt: str) -> str:
+    return _PROMPT_PREFIX + description + _PROMPT_SUFFIX
+
+async def call_gemini(prompt: str) -> str:
     """
     Calls the configured LLM endpoint. Returns text response (raw).
     NOTE: This implementation uses the Google Generative Language REST endpoint format.
@@ -59,46 +98,65 @@ def call_gemini(prompt: str) -> str:
             "text": prompt
         },
         # Optional parameters; adjust as needed
-        "temperature": 0.2,
+        "temperature": TEMPERATURE,
         "maxOutputTokens": 1024
     }
     params = {"key": API_KEY}
     headers = {"Content-Type": "application/json"}
-    resp = requests.post(API_URL, params=params, headers=headers, json=body, timeout=60)
+    resp = None
+    for attempt in range(MAX_RETRIES):
+        try:
+            resp = await asyncio.wait_for(
+                _CLIENT.post(API_URL, params=params, headers=headers, json=body),
+                timeout=REQUEST_TIMEOUT,
+            )
+            break
+        except (asyncio.TimeoutError, httpx.ReadTimeout, httpx.ConnectTimeout):
+            if attempt == MAX_RETRIES - 1:
+                raise TimeoutError(
+                    f"LLM call timed out after {MAX_RETRIES} attempts "
+                    f"({REQUEST_TIMEOUT}s each)."
+                )
+            await asyncio.sleep(0.5 * 2 ** attempt)
     resp.raise_for_status()
-    data = resp.json()
-
-    # The exact path to the generated text depends on provider response format.
-    # For Google Generative API (v1beta2), the field is often something like:
-    # data['candidates'][0]['output'] or data['results'][0]['candidates'][0]['content']
-    # We'll attempt common possibilities, then fallback to raw text.
-    # Inspect the data in logs if needed.
-    if isinstance(data, dict):
-        # Common patterns:
-        for key in ("candidates", "results", "output", "text"):
-            if key in data and isinstance(data[key], list) and data[key]:
-                # candidates list maybe contain {'content': '...'}
-                first = data[key][0]
-                if isinstance(first, dict):
-                    # try some keys
-                    for sub in ("content", "output", "text"):
-                        if sub in first:
-                            return first[sub]
-                elif isinstance(first, str):
-                    return first
-        # Fallback: try to join any text-like fields
-        for v in data.values():
-            if isinstance(v, str):
-                return v
-    # If we get here, return the raw JSON as string
-    return json.dumps(data)
-
-def generate_notes_and_relationships(description: str) -> Dict[str, Any]:
+    data = orjson.loads(resp.content)
+
+    # The endpoint is fixed per deployment, so parse the two known Gemini
+    # shapes directly instead of scanning candidate keys defensively:
+    # v1beta2 text generation -> candidates[0].output (or .content),
+    # generateContent -> candidates[0].content.parts[0].text.
+    try:
+        first = data["candidates"][0]
+        if isinstance(first, str):
+            return first
+        content = first.get("content")
+        if isinstance(content, dict):
+            return content["parts"][0]["text"]
+        if isinstance(content, str):
+            return content
+        return first["output"]
+    except (KeyError, IndexError, TypeError, AttributeError):
+        # Last resort: surface the raw payload so the caller's parse
+        # error message shows what actually came back.
+        return orjson.dumps(data).decode()
+
+async def generate_notes_and_relationships(description: str) -> Dict[str, Any]:
     """
     High-level helper: build prompt, call Gemini, parse JSON, return dict with notes and relationships.
     """
     prompt = build_prompt(description)
-    raw = call_gemini(prompt)
+    cache_key = hashlib.sha256(prompt.encode()).hexdigest()
+
+    if DETERMINISTIC:
+        cached = _EXACT_CACHE.get(cache_key)
+        if cached is not None:
+            return cached
+
+    cached = await asyncio.to_thread(_SEMANTIC_CACHE.get, description)
+    if cached is not None:
+        return cached
+
+    raw = await call_gemini(prompt)
 
     # Attempt to parse JSON from raw
     try:
@@ -111,4 +169,7 @@ def generate_notes_and_relationships(description: str) -> Dict[str, Any]:
     if not isinstance(parsed, dict) or "notes" not in parsed or "relationships" not in parsed:
         raise ValueError(f"LLM JSON missing required keys 'notes'/'relationships'. Parsed: {parsed}")
 
+    if DETERMINISTIC:
+        _EXACT_CACHE.put(cache_key, parsed)
+    await asyncio.to_thread(_SEMANTIC_CACHE.put, description, parsed)
     return parsed
@@ -1,7 +1,10 @@
+import asyncio
 import os
 import traceback
+import anyio.to_thread
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from dotenv import load_dotenv
 
 # -------------------------------------------------------
@@ -10,14 +13,16 @@ from dotenv import load_dotenv
 ENV_PATH = os.path.join(os.path.dirname(__file__), ".env")
 load_dotenv(dotenv_path=ENV_PATH)
 
-from .models import GenerateRequest, PositionUpdate
+from pydantic import ValidationError
+
+from .models import GenerateRequest, PositionUpdate, NotesAdapter, RelationshipsAdapter
 from .neo4j_service import Neo4jService
-from .llm_service import generate_notes_and_relationships
+from .llm_service import generate_notes_and_relationships, close_client
 
 # -------------------------------------------------------
 # 🔵 Create FastAPI app
 # -------------------------------------------------------
-app = FastAPI(title="AI Sticky Notes Backend")
+app = FastAPI(title="AI Sticky Notes Backend", default_response_class=ORJSONResponse)
 
 # -------------------------------------------------------
 # 🔵 Allow React frontend to call backend
@@ -41,6 +46,25 @@ except Exception as e:
     init_err = e
 
 
+# -------------------------------------------------------
+# 🔵 Startup: size the threadpool to match the Neo4j pool
+# -------------------------------------------------------
+# Keep FASTAPI_THREADS <= NEO4J_MAX_POOL_SIZE so threads never pile up
+# waiting on connection acquisition under load.
+@app.on_event("startup")
+async def tune_threadpool():
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    limiter.total_tokens = int(os.getenv("FASTAPI_THREADS", "32"))
+
+
+# -------------------------------------------------------
+# 🔵 Shutdown: close shared HTTP client
+# -------------------------------------------------------
+@app.on_event("shutdown")
+async def shutdown():
+    await close_client()
+
+
 # -------------------------------------------------------
 # 🔵 Health check
 # -------------------------------------------------------
@@ -70,26 +94,30 @@ async def generate(request: GenerateRequest):
         raise HTTPException(status_code=500, detail=f"Neo4j init error: {init_err}")
 
     try:
-        parsed = generate_notes_and_relationships(request.description)
+        parsed = await generate_notes_and_relationships(request.description)
     except Exception as e:
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=f"LLM error: {str(e)}")
 
-    notes = parsed.get("notes", [])
-    relationships = parsed.get("relationships", [])
-
     try:
-        for note in notes:
-            neo4j_service.create_note(note)
+        notes = NotesAdapter.validate_python(parsed.get("notes", []))
+        relationships = RelationshipsAdapter.validate_python(parsed.get("relationships", []))
+    except ValidationError as e:
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=f"LLM returned invalid data: {str(e)}")
 
-        for rel in relationships:
-            neo4j_service.create_relationship(rel)
+    notes = [n.model_dump() for n in notes]
+    relationships = [r.model_dump() for r in relationships]
+
+    try:
+        await asyncio.to_thread(neo4j_service.create_notes_bulk, notes)
+        await asyncio.to_thread(neo4j_service.create_relationships_bulk, relationships)
 
     except Exception as e:
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=f"DB write error: {str(e)}")
 
-    return neo4j_service.get_all_notes_and_relationships()
+    return await asyncio.to_thread(neo4j_service.get_all_notes_and_relationships)
 
 
 # -------------------------------------------------------
@@ -101,7 +129,7 @@ async def get_notes():
         raise HTTPException(status_code=500, detail=f"Neo4j init error: {init_err}")
 
     try:
-        return neo4j_service.get_all_notes_and_relationships()
+        return await asyncio.to_thread(neo4j_service.get_all_notes_and_relationships)
     except Exception as e:
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=str(e))
@@ -116,7 +144,7 @@ async def update_position(pos: PositionUpdate):
         raise HTTPException(status_code=500, detail=f"Neo4j init error: {init_err}")
 
     try:
-        neo4j_service.update_note_position(pos.id, pos.x, pos.y)
+        await asyncio.to_thread(neo4j_service.update_note_position, pos.id, pos.x, pos.y)
         return {"ok": True}
     except Exception as e:
         traceback.print_exc()
@@ -132,8 +160,26 @@ async def clear():
         raise HTTPException(status_code=500, detail=f"Neo4j init error: {init_err}")
 
     try:
-        neo4j_service.clear_database()
+        await asyncio.to_thread(neo4j_service.clear_database)
         return {"ok": True}
     except Exception as e:
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=str(e))
+
+
+# -------------------------------------------------------
+# 🔵 Entrypoint (uvloop + httptools picked up when installed)
+# -------------------------------------------------------
+if __name__ == "__main__":
+    import uvicorn
+
+    # "auto" selects uvloop and httptools when available (both are in
+    # requirements.txt); equivalent to
+    #   uvicorn backend.main:app --loop uvloop --http httptools
+    uvicorn.run(
+        "backend.main:app",
+        host=os.getenv("HOST", "0.0.0.0"),
+        port=int(os.getenv("PORT", "8000")),
+        loop=os.getenv("UVICORN_LOOP", "auto"),
+        http=os.getenv("UVICORN_HTTP", "auto"),
+    )
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, TypeAdapter
 from typing import List, Optional
 from datetime import datetime
 
@@ -28,6 +28,11 @@ class RelationshipCreate(RelationshipBase):
 class Relationship(RelationshipBase):
     id: str
 
+# Adapters validate/coerce whole LLM output lists in one pydantic-core
+# pass instead of per-field .get() handling downstream.
+NotesAdapter = TypeAdapter(List[NoteCreate])
+RelationshipsAdapter = TypeAdapter(List[RelationshipCreate])
+
 class GenerateRequest(BaseModel):
     description: str
 
@@ -1,7 +1,8 @@
 import os
+import threading
 from neo4j import GraphDatabase
-from typing import Dict, Any
-from datetime import datetime
+from typing import Dict, Any, List, Optional
+from datetime import datetime, timezone
 import uuid
 from dotenv import load_dotenv
 
@@ -11,6 +12,74 @@ from dotenv import load_dotenv
 ENV_PATH = os.path.join(os.path.dirname(__file__), ".env")
 load_dotenv(ENV_PATH)
 
+# -------------------------------------------------------
+# 🟡 Relationship-type sanitization (precompiled table)
+# -------------------------------------------------------
+# str.translate with a table built once at import replaces the per-call
+# per-character comprehension; deletion happens in C in one pass.
+_REL_TYPE_DELETE = str.maketrans(
+    "", "", "".join(chr(c) for c in range(256) if not chr(c).isalnum())
+)
+
+def _sanitize_rel_type(rel_type: str) -> str:
+    cleaned = rel_type.upper().translate(_REL_TYPE_DELETE)
+    if not cleaned.isascii():
+        # Rare path: non-latin-1 input falls back to the explicit filter.
+        cleaned = "".join(c for c in cleaned if c.isalnum())
+    return cleaned or "RELATES"
+
+# Relationship types cannot be query parameters, so the Cypher text must
+# embed them. Prebuild the queries for the types the prompt documents
+# and memoize any stragglers, so the server's plan cache sees one stable
+# string per type instead of a fresh f-string per call.
+def _rel_bulk_query(rel_type: str) -> str:
+    return (
+        "UNWIND $rows AS row\n"
+        "MATCH (a:Note {id: row.fromId}), (b:Note {id: row.toId})\n"
+        f"MERGE (a)-[r:{rel_type}]->(b)\n"
+        "SET r.label = row.label"
+    )
+
+def _rel_single_query(rel_type: str) -> str:
+    return (
+        "MATCH (a:Note {id: $fromId}), (b:Note {id: $toId})\n"
+        f"MERGE (a)-[r:{rel_type}]->(b)\n"
+        "SET r.label = $label\n"
+        "RETURN r"
+    )
+
+_KNOWN_REL_TYPES = ("SUPPORTS", "RELATES", "CONTRADICTS")
+_REL_BULK_QUERIES = {t: _rel_bulk_query(t) for t in _KNOWN_REL_TYPES}
+_REL_SINGLE_QUERIES = {t: _rel_single_query(t) for t in _KNOWN_REL_TYPES}
+
+# Sanitized types come from LLM output, so cap how many stragglers the
+# memo dicts may accumulate; past the cap the query is built per call.
+_REL_QUERY_MEMO_MAX = 64
+
+def _rel_query_for(memo: Dict[str, str], rel_type: str, build) -> str:
+    query = memo.get(rel_type)
+    if query is None:
+        query = build(rel_type)
+        if len(memo) < _REL_QUERY_MEMO_MAX:
+            memo[rel_type] = query
+    return query
+
+def _bulk_uuid4(n: int) -> List[str]:
+    """
+    Generate n UUID4 strings from one os.urandom read instead of one
+    syscall per uuid.uuid4() call.
+    """
+    buf = bytearray(os.urandom(16 * n))
+    out = []
+    for off in range(0, 16 * n, 16):
+        buf[off + 6] = (buf[off + 6] & 0x0F) | 0x40  # version 4
+        buf[off + 8] = (buf[off + 8] & 0x3F) | 0x80  # RFC 4122 variant
+        out.append(str(uuid.UUID(bytes=bytes(buf[off:off + 16]))))
+    return out
+
+def _utc_now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="milliseconds")
+
 class Neo4jService:
     def __init__(self):
         # -------------------------------------------------------
@@ -29,9 +98,41 @@ class Neo4jService:
             raise ValueError("NEO4J_URI, NEO4J_USER and NEO4J_PASSWORD must be set in environment.")
 
         # -------------------------------------------------------
-        # 🔵 Connect Neo4j Driver
+        # 🔵 Connect Neo4j Driver (tuned connection pool)
         # -------------------------------------------------------
-        self.driver = GraphDatabase.driver(uri, auth=(user, password))
+        self.driver = GraphDatabase.driver(
+            uri,
+            auth=(user, password),
+            max_connection_pool_size=int(os.getenv("NEO4J_MAX_POOL_SIZE", "50")),
+            connection_acquisition_timeout=30,
+            max_connection_lifetime=3600,
+            keep_alive=True,
+        )
+
+        # In-process copy of the full graph. /notes is served from here
+        # until a write invalidates it (guarded by a lock because the
+        # sync service methods run on threadpool threads). The
+        # generation counter detects writes that land while a cache-miss
+        # fetch is in flight, so a pre-write snapshot is never installed
+        # over them.
+        self._graph_cache: Optional[Dict[str, Any]] = None
+        self._cache_gen = 0
+        self._cache_lock = threading.Lock()
+
+        self._ensure_schema()
+
+    # -------------------------------------------------------
+    # 🔵 Ensure Indexes / Constraints
+    # -------------------------------------------------------
+    def _ensure_schema(self) -> None:
+        # Unique constraint on Note.id gives MERGE/MATCH an index lookup
+        # instead of a label scan, and guards against duplicate notes.
+        query = """
+        CREATE CONSTRAINT note_id_unique IF NOT EXISTS
+        FOR (n:Note) REQUIRE n.id IS UNIQUE
+        """
+        with self.driver.session() as session:
+            session.run(query).consume()
 
     def close(self):
         self.driver.close()
@@ -41,7 +142,7 @@ class Neo4jService:
     # -------------------------------------------------------
     def create_note(self, note: Dict[str, Any]) -> Dict[str, Any]:
         note_id = note.get("id") or str(uuid.uuid4())
-        timestamp = note.get("timestamp") or datetime.utcnow().isoformat()
+        timestamp = note.get("timestamp") or _utc_now_iso()
 
         query = """
         MERGE (n:Note {id: $id})
@@ -65,70 +166,172 @@ class Neo4jService:
         }
 
         with self.driver.session() as session:
-            rec = session.run(query, params).single()
-            return dict(rec["n"])
+            rec = session.execute_write(lambda tx: tx.run(query, params).single())
+
+        self._invalidate_cache()
+        return dict(rec["n"])
 
     # -------------------------------------------------------
-    # 🟡 Create Relationship
+    # 🟡 Create Notes (bulk, single round-trip)
     # -------------------------------------------------------
-    def create_relationship(self, rel: Dict[str, Any]) -> Dict[str, Any]:
-        rel_type = rel.get("type", "RELATES").upper()
-        rel_type = "".join([c for c in rel_type if c.isalnum()])  # sanitize
-
-        query = f"""
-        MATCH (a:Note {{id: $fromId}}), (b:Note {{id: $toId}})
-        MERGE (a)-[r:{rel_type}]->(b)
-        SET r.label = $label
-        RETURN r
+    def create_notes_bulk(self, notes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        if not notes:
+            return []
+
+        # One timestamp and one urandom read for the whole batch.
+        now = _utc_now_iso()
+        missing = sum(1 for note in notes if not note.get("id"))
+        fresh_ids = iter(_bulk_uuid4(missing)) if missing else iter(())
+
+        rows = []
+        for note in notes:
+            rows.append({
+                "id": note.get("id") or next(fresh_ids),
+                "title": note.get("title"),
+                "content": note.get("content"),
+                "color": note.get("color", "#ffeb3b"),
+                "x": note.get("x", 100),
+                "y": note.get("y", 100),
+                "timestamp": note.get("timestamp") or now,
+            })
+
+        query = """
+        UNWIND $rows AS row
+        MERGE (n:Note {id: row.id})
+        SET n.title = row.title,
+            n.content = row.content,
+            n.color = row.color,
+            n.x = row.x,
+            n.y = row.y,
+            n.timestamp = row.timestamp
         """
 
         with self.driver.session() as session:
-            rec = session.run(query, {
+            session.execute_write(lambda tx: tx.run(query, rows=rows).consume())
+
+        # Write-through: fold the new rows into the cached graph so the
+        # response after /generate needs no re-read from Neo4j.
+        with self._cache_lock:
+            self._cache_gen += 1
+            if self._graph_cache is not None:
+                by_id = {n["id"]: n for n in self._graph_cache["notes"]}
+                for row in rows:
+                    by_id[row["id"]] = row
+                self._graph_cache["notes"] = list(by_id.values())
+        return rows
+
+    # -------------------------------------------------------
+    # 🟡 Create Relationships (bulk, one round-trip per type)
+    # -------------------------------------------------------
+    def create_relationships_bulk(self, rels: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        if not rels:
+            return []
+
+        # Relationship types cannot be parameterized in Cypher, so group
+        # rows by sanitized type and run one UNWIND query per group.
+        groups: Dict[str, List[Dict[str, Any]]] = {}
+        out = []
+        for rel in rels:
+            rel_type = _sanitize_rel_type(rel.get("type", "RELATES"))
+            row = {
                 "fromId": rel["fromId"],
                 "toId": rel["toId"],
-                "label": rel.get("label", "")
-            }).single()
+                "label": rel.get("label", ""),
+            }
+            groups.setdefault(rel_type, []).append(row)
+            out.append({"type": rel_type, **row})
+
+        def _write(tx):
+            for rel_type, rows in groups.items():
+                query = _rel_query_for(_REL_BULK_QUERIES, rel_type, _rel_bulk_query)
+                tx.run(query, rows=rows).consume()
+
+        with self.driver.session() as session:
+            session.execute_write(_write)
+
+        with self._cache_lock:
+            self._cache_gen += 1
+            if self._graph_cache is not None:
+                by_key = {
+                    (r["fromId"], r["toId"], r["type"]): r
+                    for r in self._graph_cache["relationships"]
+                }
+                for row in out:
+                    by_key[(row["fromId"], row["toId"], row["type"])] = row
+                self._graph_cache["relationships"] = list(by_key.values())
+        return out
+
+    # -------------------------------------------------------
+    # 🟡 Create Relationship
+    # -------------------------------------------------------
+    def create_relationship(self, rel: Dict[str, Any]) -> Dict[str, Any]:
+        rel_type = _sanitize_rel_type(rel.get("type", "RELATES"))
+        query = _rel_query_for(_REL_SINGLE_QUERIES, rel_type, _rel_single_query)
+
+        params = {
+            "fromId": rel["fromId"],
+            "toId": rel["toId"],
+            "label": rel.get("label", "")
+        }
+
+        with self.driver.session() as session:
+            rec = session.execute_write(lambda tx: tx.run(query, params).single())
 
-            r = rec["r"]
-            return {"type": rel_type, "properties": dict(r)}
+        self._invalidate_cache()
+        r = rec["r"]
+        return {"type": rel_type, "properties": dict(r)}
 
     # -------------------------------------------------------
     # 🟢 Get All Notes + Relationships
     # -------------------------------------------------------
     def get_all_notes_and_relationships(self) -> Dict[str, Any]:
-        query_notes = "MATCH (n:Note) RETURN n"
-        query_rels = """
-        MATCH (a:Note)-[r]->(b:Note)
-        RETURN a.id AS fromId, b.id AS toId, type(r) AS type, r.label AS label
-        """
+        with self._cache_lock:
+            if self._graph_cache is not None:
+                return self._graph_cache
+            gen = self._cache_gen
+
+        graph = self._fetch_all_notes_and_relationships()
+
+        with self._cache_lock:
+            # Only install the snapshot if no write landed during the
+            # fetch; a stale install would mask that write until the
+            # next invalidation. The snapshot itself is still fresh
+            # enough to return either way.
+            if self._cache_gen == gen:
+                self._graph_cache = graph
+        return graph
+
+    def _invalidate_cache(self) -> None:
+        with self._cache_lock:
+            self._graph_cache = None
+            self._cache_gen += 1
 
-        notes = []
-        rels = []
+    def _fetch_all_notes_and_relationships(self) -> Dict[str, Any]:
+        # One query, one round-trip: both collections are built server-side
+        # and returned in a single record, so no per-row dict construction
+        # in Python either.
+        query = """
+        CALL {
+            MATCH (n:Note)
+            RETURN collect({
+                id: n.id, title: n.title, content: n.content,
+                color: n.color, x: n.x, y: n.y, timestamp: n.timestamp
+            }) AS notes
+        }
+        CALL {
+            MATCH (a:Note)-[r]->(b:Note)
+            RETURN collect({
+                fromId: a.id, toId: b.id,
+                type: type(r), label: coalesce(r.label, "")
+            }) AS rels
+        }
+        RETURN notes, rels
+        """
 
         with self.driver.session() as session:
-            # Notes
-            for rec in session.run(query_notes):
-                n = rec["n"]
-                notes.append({
-                    "id": n.get("id"),
-                    "title": n.get("title"),
-                    "content": n.get("content"),
-                    "color": n.get("color"),
-                    "x": n.get("x"),
-                    "y": n.get("y"),
-                    "timestamp": n.get("timestamp"),
-                })
-
-            # Relationships
-            for rec in session.run(query_rels):
-                rels.append({
-                    "fromId": rec["fromId"],
-                    "toId": rec["toId"],
-                    "type": rec["type"],
-                    "label": rec["label"] or ""
-                })
-
-        return {"notes": notes, "relationships": rels}
+            rec = session.execute_read(lambda tx: tx.run(query).single())
+
+        return {"notes": rec["notes"], "relationships": rec["rels"]}
 
     # -------------------------------------------------------
     # 🟡 Update Note Position
@@ -140,11 +343,28 @@ class Neo4jService:
         RETURN n
         """
         with self.driver.session() as session:
-            session.run(query, {"id": note_id, "x": x, "y": y})
+            session.execute_write(
+                lambda tx: tx.run(query, {"id": note_id, "x": x, "y": y}).consume()
+            )
+
+        # Write-through: patch the cached note instead of dropping the
+        # whole cache for a position drag.
+        with self._cache_lock:
+            self._cache_gen += 1
+            if self._graph_cache is not None:
+                for note in self._graph_cache["notes"]:
+                    if note["id"] == note_id:
+                        note["x"] = x
+                        note["y"] = y
+                        break
 
     # -------------------------------------------------------
     # 🔴 Clear All Data (DEV ONLY)
     # -------------------------------------------------------
     def clear_database(self) -> None:
         with self.driver.session() as session:
-            session.run("MATCH (n) DETACH DELETE n")
+            session.execute_write(lambda tx: tx.run("MATCH (n) DETACH DELETE n").consume())
+
+        with self._cache_lock:
+            self._cache_gen += 1
+            self._graph_cache = {"notes": [], "relationships": []}
@@ -1,37 +1,62 @@
-import re
-import json
-from typing import Any
+import orjson
+from typing import Optional
+
+def _find_json_end(text: str, start: int) -> Optional[int]:
+    """
+    Scan once from the opening brace/bracket at start, tracking depth
+    while respecting string literals and escapes. Returns the index
+    just past the matching close, or None if the block never balances.
+    """
+    depth = 0
+    in_string = False
+    escape = False
+    for i in range(start, len(text)):
+        ch = text[i]
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+            continue
+        if ch == '"':
+            in_string = True
+        elif ch in "{[":
+            depth += 1
+        elif ch in "}]":
+            depth -= 1
+            if depth == 0:
+                return i + 1
+    return None
 
 def extract_json_from_text(text: str):
     """
-    Try to find a JSON object or array inside a free text response.
-    Returns parsed object or raises ValueError if none found.
+    Find and parse a JSON object or array inside a free text response.
+    Returns the parsed object or raises ValueError if none found.
     """
-    # A naive approach: find first "{" that starts JSON and the matching closing "}"
-    # Attempt to find both object and array
     text = text.strip()
-    # First look for a JSON block that starts with '[' or '{'
-    start = None
-    for i, ch in enumerate(text):
-        if ch in ["{", "["]:
-            start = i
-            break
-    if start is None:
+    if not text:
         raise ValueError("No JSON object found in text.")
-    # Try to parse progressively larger slices until valid JSON found or exhausted
-    for end in range(len(text), start, -1):
-        try:
-            candidate = text[start:end]
-            parsed = json.loads(candidate)
-            return parsed
-        except Exception:
-            continue
-    # fallback: try to search with regex for {...}
-    json_matches = re.findall(r'(\{(?:[^{}]|(?1))*\})', text)
-    if json_matches:
-        for jm in json_matches:
-            try:
-                return json.loads(jm)
-            except Exception:
-                continue
-    raise ValueError("Could not extract JSON from text.")
+
+    # Locate the start with str.find (C-level) so plainly invalid input
+    # (empty, refusals, prose with no braces) is rejected without a
+    # Python-level character loop.
+    obj = text.find("{")
+    arr = text.find("[")
+    if obj < 0:
+        start = arr
+    elif arr < 0:
+        start = obj
+    else:
+        start = min(obj, arr)
+    if start < 0:
+        raise ValueError("No JSON object found in text.")
+
+    end = _find_json_end(text, start)
+    if end is None:
+        raise ValueError("Could not extract JSON from text.")
+    try:
+        return orjson.loads(text[start:end])
+    except orjson.JSONDecodeError as e:
+        raise ValueError("Could not extract JSON from text.") from e